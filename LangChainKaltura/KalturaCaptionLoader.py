@@ -1,17 +1,104 @@
+import asyncio
+import codecs
 import hashlib
+import io
+import re
+import string
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.message import Message
 from enum import Enum, auto
-from typing import List, Self, Sequence
+from itertools import chain
+from functools import partial
+from typing import Callable, Hashable, Iterable, Iterator, List, Self, Sequence
 
-import pysrt
+import aiohttp
 import requests
 from KalturaClient import KalturaClient, KalturaConfiguration
 from KalturaClient.Plugins.Caption import (
-    KalturaCaptionAssetFilter, KalturaCaptionType, KalturaCaptionAsset)
+    KalturaCaptionAssetFilter, KalturaCaptionAssetListResponse,
+    KalturaCaptionType, KalturaCaptionAsset)
 from KalturaClient.Plugins.Core import (
-    KalturaMediaEntryFilter, KalturaSessionType, KalturaMediaEntry)
+    KalturaMediaEntryFilter, KalturaMediaListResponse, KalturaSessionType,
+    KalturaMediaEntry)
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from langchain_community.document_loaders.base import BaseLoader
 from langchain_core.documents import Document
 
+_SRT_TIMING_PATTERN = re.compile(r'\s*(\d+):(\d+):(\d+)[,.](\d+)\s*-->')
+
+
+def _parseSrt(lines: Iterable[str]) -> Iterator[tuple[int, str]]:
+    """
+    Parse SRT captions from `lines`, yielding the start time of each caption
+    in milliseconds and its text.  Blocks without a valid timing line are
+    skipped.
+    """
+    block: List[str] = []
+    for line in chain(lines, ('',)):
+        if line.strip():
+            block.append(line.rstrip())
+        elif block:
+            # The caption index line is optional.
+            timingIndex = 0 if '-->' in block[0] else 1
+            if timingIndex < len(block) and (
+                    match := _SRT_TIMING_PATTERN.match(block[timingIndex])):
+                (hours, minutes, seconds, milliseconds) = map(
+                    int, match.groups())
+                yield ((((hours * 60 + minutes) * 60 + seconds) * 1000
+                        + milliseconds),
+                       '\n'.join(block[timingIndex + 1:]))
+            block = []
+
+
+def _captionCharset(contentType: str | None) -> str:
+    """
+    Get the character set for decoding a caption file from the `charset`
+    parameter of its `Content-Type` header only.  If it's missing or
+    unknown, or it's UTF-8, use `utf-8-sig` so that a leading byte order
+    mark doesn't hide the first caption.
+    """
+    message = Message()
+    message['Content-Type'] = contentType or ''
+    try:
+        charset = codecs.lookup(message.get_content_charset() or '').name
+    except LookupError:
+        charset = 'utf-8'
+    return 'utf-8-sig' if charset == 'utf-8' else charset
+
+
+class _TtlCache:
+    """
+    Thread-safe mapping whose entries expire `ttlSeconds` after they are
+    stored.  Beyond `maxSize` entries, the oldest are evicted.
+    """
+
+    def __init__(self, maxSize: int, ttlSeconds: float):
+        self.maxSize = maxSize
+        self.ttlSeconds = ttlSeconds
+        self._entries: dict[Hashable, tuple[object, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> object | None:
+        with self._lock:
+            if (entry := self._entries.get(key)) is None:
+                return None
+            value, expiresAt = entry
+            if time.monotonic() >= expiresAt:
+                del self._entries[key]
+                return None
+            return value
+
+    def __setitem__(self, key: Hashable, value: object):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.monotonic() + self.ttlSeconds)
+            while len(self._entries) > self.maxSize:
+                del self._entries[next(iter(self._entries))]
+
 
 class KalturaCaptionLoader(BaseLoader):
     """
@@ -31,6 +118,35 @@ class KalturaCaptionLoader(BaseLoader):
     """Various English dialects from ISO 639-1, ordered by similarity to 
       `en-us`.  For an unofficial listing of languages with dialects, see: 
       https://gist.github.com/jrnk/8eb57b065ea0b098d571#file-iso-639-1-language-json"""
+    HTTP_TIMEOUT = (5, 30)
+    """Connect and read timeouts, in seconds, for caption downloads."""
+    DOWNLOAD_WORKERS = 32
+    """Maximum number of caption files downloaded concurrently, across all
+      media entries.  Also the size of the HTTP connection pool."""
+    MEDIA_WORKERS = 16
+    """Maximum number of media entries processed concurrently."""
+    ASYNC_CONNECTIONS = 32
+    """Maximum number of concurrent caption downloads in `aload()`."""
+    MULTIREQUEST_SIZE = 50
+    """Maximum number of Kaltura API calls batched into one multirequest."""
+    CAPTION_CACHE_SIZE = 1024
+    """Maximum number of caption asset lists, and of caption URLs, cached."""
+    CAPTION_LIST_CACHE_SECONDS = 300
+    """How long a media entry's list of caption assets is reused."""
+    CAPTION_URL_CACHE_SECONDS = 60
+    """How long a caption asset's URL is reused.  It's kept shorter than the
+      list cache because Kaltura's caption URLs may be signed to expire."""
+    SESSION_RENEWAL_SECONDS = 300
+    """A cached Kaltura session is renewed once it is this close to expiry."""
+
+    _KS_CACHE: dict[tuple, tuple[str, float]] = {}
+    """Kaltura session strings (KS) and their monotonic expiry times, shared
+      by loader instances created with the same credentials and API URL."""
+    _KS_CACHE_LOCK = threading.Lock()
+    """Guards `_KS_CACHE` and `_KS_CACHE_KEY_LOCKS`."""
+    _KS_CACHE_KEY_LOCKS: dict[tuple, threading.Lock] = {}
+    """Per-credentials locks, so concurrent constructors with the same
+      credentials start only one session, without blocking others."""
 
     class FilterType(Enum):
         """
@@ -64,7 +180,8 @@ class KalturaCaptionLoader(BaseLoader):
                  languages: Sequence[str] | None = LANGUAGES_DEFAULT,
                  expirySeconds: int = EXPIRY_SECONDS_DEFAULT,
                  chunkMinutes: int = CHUNK_MINUTES_DEFAULT,
-                 kalturaApiBaseUrl: str = None):
+                 kalturaApiBaseUrl: str = None,
+                 preferFirstLanguageOnly: bool = False):
         """
         :param partnerId: Partner ID in Kaltura (i.e., the KAF ID).
         :param appTokenId: ID of the app token configured in Kaltura.
@@ -92,11 +209,16 @@ class KalturaCaptionLoader(BaseLoader):
             of the Kaltura auth. session.  *Defaults to value of
             `KalturaCaptionLoader.EXPIRY_SECONDS_DEFAULT`.*
         :param chunkMinutes: *Optional* Integer number of minutes of the length
-            of each caption chunk loaded from Kaltura.  *Defaults to value of
-            `KalturaCaptionLoader.CHUNK_MINUTES_DEFAULT`.*
+            of each caption chunk loaded from Kaltura, at least 1.  *Defaults
+            to value of `KalturaCaptionLoader.CHUNK_MINUTES_DEFAULT`.*
         :param kalturaApiBaseUrl: *Optional* String base URL of the Kaltura API
             service.  *Defaults to value of
             `KalturaConfiguration().serviceUrl`.*
+        :param preferFirstLanguageOnly: *Optional* Boolean indicating whether
+            to load only one caption asset per media entry, the one whose
+            language appears earliest in `languages`.  Ignored if `languages`
+            is `None`.  *Defaults to `False`, loading captions in all of
+            `languages`.*
         """
 
         if not all((partnerId, appTokenId, appTokenValue)):
@@ -114,35 +236,138 @@ class KalturaCaptionLoader(BaseLoader):
             raise ValueError('urlFormat must be specified, with fields for'
                              '"{mediaId}" and "{startSeconds}".')
 
+        # Parsed once here, which also rejects malformed templates early.
+        urlTemplateParts = list(string.Formatter().parse(urlTemplate))
+        if unknownFields := {
+                fieldName for (_, fieldName, _, _) in urlTemplateParts
+                if fieldName is not None} - {'mediaId', 'startSeconds'}:
+            raise ValueError(f'urlTemplate fields {sorted(unknownFields)} '
+                             'are not supported; use only "{mediaId}" and '
+                             '"{startSeconds}".')
+
+        if int(chunkMinutes) < 1:
+            raise ValueError(f'chunkMinutes ({chunkMinutes}) must be at '
+                             'least 1')
+
         config = KalturaConfiguration()
         if kalturaApiBaseUrl is not None:
             config.serviceUrl = kalturaApiBaseUrl
         client = KalturaClient(config)
 
-        widgetSession = client.session.startWidgetSession(f'_{partnerId}')
-
-        appTokenHash = hashlib.sha512(
-            (widgetSession.ks + appTokenValue).encode('ascii')).hexdigest()
-
-        client.setKs(widgetSession.ks)
-
-        appSession = client.appToken.startSession(
-            appTokenId, appTokenHash, type=KalturaSessionType.USER,
-            expiry=expirySeconds)
-
-        client.setKs(appSession.ks)
+        client.setKs(self._getSessionKs(
+            client, partnerId, appTokenId, appTokenValue, expirySeconds,
+            kalturaApiBaseUrl))
         self.client = client
-
-        self.mediaFilter: KalturaMediaEntryFilter | None = None
+        # `KalturaClient` keeps per-request state, so calls to it from
+        # worker threads must be serialized.
+        self._clientLock = threading.Lock()
+        # Reused across calls of `load()` on the same loader.
+        self._captionAssetsCache = _TtlCache(
+            self.CAPTION_CACHE_SIZE, self.CAPTION_LIST_CACHE_SECONDS)
+        self._captionUrlCache = _TtlCache(
+            self.CAPTION_CACHE_SIZE, self.CAPTION_URL_CACHE_SECONDS)
+
+        # Equivalent to `setMediaCategory()` or `setMediaEntry()`, which
+        # remain available to change the filter after construction.
+        self.mediaFilter: KalturaMediaEntryFilter | None = \
+            KalturaMediaEntryFilter()
         if filterType == self.FilterType.CATEGORY:
-            self.setMediaCategory(filterValue)
+            self.mediaFilter.categoriesMatchAnd = filterValue
         else:
-            self.setMediaEntry(filterValue)
+            self.mediaFilter.idEqual = filterValue
 
         self.chunkMinutes = int(chunkMinutes)
         self.urlTemplate = urlTemplate
-        self.languages = (None if languages is None
-            else map(str.lower, languages))
+        self._urlTemplateParts = urlTemplateParts
+        # Rank of each language by its first position in `languages`, for
+        # constant-time lookups when choosing the preferred caption.
+        self._languageRanks: dict[str, int] | None = None
+        self.languages: frozenset[str] | None = None
+        if languages is not None:
+            self._languageRanks = {}
+            for language in languages:
+                self._languageRanks.setdefault(
+                    language.lower(), len(self._languageRanks))
+            self.languages = frozenset(self._languageRanks)
+        self.preferFirstLanguageOnly = preferFirstLanguageOnly
+
+        # Caption files are served from a small set of CDN hosts, so a
+        # persistent session lets downloads reuse pooled connections.
+        self._http = requests.Session()
+        httpAdapter = HTTPAdapter(
+            pool_connections=4, pool_maxsize=self.DOWNLOAD_WORKERS,
+            max_retries=Retry(total=3, backoff_factor=0.2,
+                              status_forcelist=[502, 503, 504]))
+        self._http.mount('https://', httpAdapter)
+        self._http.mount('http://', httpAdapter)
+        # Shared by all media entries, so concurrent downloads never exceed
+        # the connection pool's size.
+        self._downloadExecutor = ThreadPoolExecutor(
+            max_workers=self.DOWNLOAD_WORKERS)
+
+    @classmethod
+    def _getSessionKs(cls, client: KalturaClient, partnerId: str,
+                      appTokenId: str, appTokenValue: str,
+                      expirySeconds: int, kalturaApiBaseUrl: str | None) -> \
+            str:
+        # The app token value is a secret, so only its digest is kept.
+        cacheKey = (partnerId, appTokenId,
+                    hashlib.sha256(appTokenValue.encode()).hexdigest(),
+                    kalturaApiBaseUrl)
+
+        with cls._KS_CACHE_LOCK:
+            keyLock = cls._KS_CACHE_KEY_LOCKS.setdefault(
+                cacheKey, threading.Lock())
+
+        with keyLock:
+            with cls._KS_CACHE_LOCK:
+                cached = cls._KS_CACHE.get(cacheKey)
+            if cached is not None:
+                ks, expiresAt = cached
+                if expiresAt - time.monotonic() > cls.SESSION_RENEWAL_SECONDS:
+                    return ks
+
+            requestedAt = time.monotonic()
+            widgetSession = client.session.startWidgetSession(
+                f'_{partnerId}')
+
+            # Hashed incrementally to avoid building a copy of the secret.
+            appTokenHasher = hashlib.sha512()
+            appTokenHasher.update(widgetSession.ks.encode('ascii'))
+            appTokenHasher.update(appTokenValue.encode('ascii'))
+            appTokenHash = appTokenHasher.hexdigest()
+
+            client.setKs(widgetSession.ks)
+
+            appSession = client.appToken.startSession(
+                appTokenId, appTokenHash, type=KalturaSessionType.USER,
+                expiry=expirySeconds)
+
+            # Kaltura may grant less than requested; `expiry` is the actual
+            # end of the session, in epoch seconds.
+            if isinstance(appSession.expiry, int):
+                expiresAt = appSession.expiry - time.time() + time.monotonic()
+            else:
+                expiresAt = requestedAt + expirySeconds
+
+            with cls._KS_CACHE_LOCK:
+                cls._KS_CACHE[cacheKey] = (appSession.ks, expiresAt)
+            return appSession.ks
+
+    def close(self):
+        """
+        Release the threads and pooled HTTP connections used for caption
+        downloads.  The synchronous loading methods can't be used afterward.
+        """
+        self._downloadExecutor.shutdown()
+        self._http.close()
+
+    def __del__(self):
+        # `__init__` may have raised before these were created.
+        if (executor := getattr(self, '_downloadExecutor', None)) is not None:
+            executor.shutdown(wait=False)
+        if (http := getattr(self, '_http', None)) is not None:
+            http.close()
 
     def setMediaEntry(self, mediaEntryId: str) -> Self:
         self.mediaFilter = KalturaMediaEntryFilter()
@@ -155,66 +380,305 @@ class KalturaCaptionLoader(BaseLoader):
         return self
 
     def load(self) -> List[Document]:
+        return list(self.lazy_load())
+
+    def lazy_load(self) -> Iterator[Document]:
+        """
+        Yield documents as the captions of each media entry are loaded, so
+        they can be processed while the remaining media are still loading.
+        """
         if self.mediaFilter is None:
             raise ValueError('Media filter is not defined')
 
-        mediaEntries = self.client.media.list(self.mediaFilter)
+        mediaEntries = self._listMedia()
+
+        if not mediaEntries.objects:
+            return
+
+        captionAssetLists = self._listCaptionAssets(mediaEntries.objects)
+
+        maxWorkers = min(self.MEDIA_WORKERS, len(mediaEntries.objects))
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            # Bounding the queue of results keeps only a few media entries'
+            # documents in memory when the consumer is slower than Kaltura.
+            pending: deque[Future[List[Document]]] = deque()
+            try:
+                for mediaEntry, captionAssets in zip(
+                        mediaEntries.objects, captionAssetLists):
+                    pending.append(executor.submit(
+                        self.fetchMediaCaption, mediaEntry, captionAssets))
+                    if len(pending) >= maxWorkers:
+                        yield from pending.popleft().result()
+
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                # Don't load media nobody will consume if iteration stops.
+                executor.shutdown(cancel_futures=True)
+
+    def fetchMediaCaption(
+            self, mediaEntry: KalturaMediaEntry,
+            captionAssets: KalturaCaptionAssetListResponse | None = None) -> \
+            List[Document]:
+        """
+        :param mediaEntry: Kaltura media entry whose captions are loaded.
+        :param captionAssets: *Optional* Result of listing the caption assets
+            of `mediaEntry`, if already retrieved.  *Defaults to `None`, in
+            which case they are listed here.*
+        """
+        if captionAssets is None:
+            (captionAssets,) = self._listCaptionAssets([mediaEntry])
 
-        documents: List[Document] = []
-        for mediaEntry in mediaEntries.objects:
-            documents.extend(self.fetchMediaCaption(mediaEntry))
+        srtAssets = self._srtCaptionAssets(captionAssets)
 
-        return documents
+        captionUrls = self._captionUrls(srtAssets)
 
-    def fetchMediaCaption(self, mediaEntry: KalturaMediaEntry) -> \
-            List[Document]:
-        captionFilter = KalturaCaptionAssetFilter()
-        captionFilter.entryIdEqual = mediaEntry.id
+        # Downloads are network-bound, so they run concurrently.  Each one
+        # is parsed as it streams in; chunking stays on the calling thread.
+        captionFiles = list(
+            self._downloadExecutor.map(self._fetchCaptions, captionUrls))
 
         captionDocuments: List[Document] = []
-        captionAssets = self.client.caption.captionAsset.list(captionFilter)
-        captionAsset: KalturaCaptionAsset
-        for captionAsset in captionAssets.objects:
-            # XXX: Kaltura caption assets have an `isDefault` property.
-            #   However, media doesn't always have a default caption asset.
-            #   It seems wise to load all captions, even if they're all of
-            #   the same language or low accuracy ratings.
-
-            # Skip captions not in specified language(s)
-            if (self.languages is not None and
-                    captionAsset.languageCode.value.lower() not in
-                    self.languages):
-                continue
-
-            # Only the SRT format supported at this time
-            if captionAsset.format.value == KalturaCaptionType.SRT:
-                # Kaltura's `caption.captionAsset.serve()` seemed like it
-                # would give caption contents, but it also only
-                # returned a URL to the captions.
-                captionUrl = self.client.caption.captionAsset.getUrl(
-                    captionAsset.id)
-                captionSource = requests.get(captionUrl).text
-                captions = pysrt.from_string(captionSource)
-
-                index = 0
-                while (captionsSection := captions.slice(
-                        starts_after={
-                            'minutes': (start := self.chunkMinutes * index)},
-                        ends_before={'minutes': start + self.chunkMinutes})):
-                    timestamp = captionsSection[0].start
-                    captionDocuments.append(Document(
-                        page_content=captionsSection.text,
-                        metadata={
-                            # Start time is sliced to remove milliseconds.
-                            'source': self.urlTemplate.format(
-                                mediaId=mediaEntry.id,
-                                startSeconds=timestamp.ordinal // 1000),
-                            'filename': mediaEntry.name,
-                            'media_id': mediaEntry.id,
-                            'timestamp': str(timestamp)[0:-4],  # no ms
-                            'caption_id': captionAsset.id,
-                            'language_code': captionAsset.languageCode.value,
-                            'caption_format': 'SRT', }))
-                    index += 1
+        for captionAsset, captions in zip(srtAssets, captionFiles):
+            captionDocuments.extend(
+                self._captionDocuments(mediaEntry, captionAsset, captions))
 
         return captionDocuments
+
+    async def aload(self) -> List[Document]:
+        """
+        Asynchronous version of `load()`.  The Kaltura API client is
+        synchronous, so its calls are run in worker threads, but all caption
+        files are downloaded concurrently on the event loop.
+        """
+        if self.mediaFilter is None:
+            raise ValueError('Media filter is not defined')
+
+        mediaEntries = await asyncio.to_thread(self._listMedia)
+
+        if not mediaEntries.objects:
+            return []
+
+        captionAssetLists = await asyncio.to_thread(
+            self._listCaptionAssets, mediaEntries.objects)
+
+        mediaCaptionAssets = [
+            (mediaEntry, captionAsset)
+            for mediaEntry, captionAssets
+            in zip(mediaEntries.objects, captionAssetLists)
+            for captionAsset in self._srtCaptionAssets(captionAssets)]
+
+        captionUrls = await asyncio.to_thread(
+            self._captionUrls,
+            [captionAsset for (_, captionAsset) in mediaCaptionAssets])
+
+        async with aiohttp.ClientSession(
+                raise_for_status=True,
+                connector=aiohttp.TCPConnector(
+                    limit=self.ASYNC_CONNECTIONS, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self.HTTP_TIMEOUT[0],
+                    sock_read=self.HTTP_TIMEOUT[1])) as session:
+            captionSources = await asyncio.gather(*(
+                self._afetchCaptionSource(session, captionUrl)
+                for captionUrl in captionUrls))
+
+        documents: List[Document] = []
+        for (mediaEntry, captionAsset), captionSource in zip(
+                mediaCaptionAssets, captionSources):
+            # Parsing is CPU-bound, so it's kept off the event loop.
+            captions = await asyncio.to_thread(
+                list, _parseSrt(io.StringIO(captionSource, newline=None)))
+            documents.extend(
+                self._captionDocuments(mediaEntry, captionAsset, captions))
+
+        return documents
+
+    def _srtCaptionAssets(
+            self, captionAssets: KalturaCaptionAssetListResponse) -> \
+            List[KalturaCaptionAsset]:
+        # XXX: Kaltura caption assets have an `isDefault` property.
+        #   However, media doesn't always have a default caption asset.
+        #   It seems wise to load all captions, even if they're all of
+        #   the same language or low accuracy ratings.
+
+        # Only the SRT format supported at this time.  Skip captions not in
+        # specified language(s).
+        srtAssets: List[KalturaCaptionAsset] = [
+            captionAsset for captionAsset in captionAssets.objects
+            if captionAsset.format.value == KalturaCaptionType.SRT and (
+                self.languages is None or
+                captionAsset.languageCode.value.lower() in self.languages)]
+
+        if self.preferFirstLanguageOnly and self.languages is not None and \
+                srtAssets:
+            srtAssets = [min(
+                srtAssets, key=lambda captionAsset: self._languageRanks.get(
+                    captionAsset.languageCode.value.lower(),
+                    len(self._languageRanks)))]
+
+        return srtAssets
+
+    def _captionDocuments(self, mediaEntry: KalturaMediaEntry,
+                          captionAsset: KalturaCaptionAsset,
+                          captions: Iterable[tuple[int, str]]) -> \
+            Iterator[Document]:
+        chunkMilliseconds = self.chunkMinutes * 60_000
+        sourceTemplate = self._sourceTemplate(mediaEntry.id)
+
+        # Group captions into chunks by start time in a single pass.  Each
+        # chunk holds the start time of its first caption and all the texts.
+        chunks: dict[int, tuple[int, List[str]]] = {}
+        for (startMilliseconds, text) in captions:
+            chunks.setdefault(
+                startMilliseconds // chunkMilliseconds,
+                (startMilliseconds, []))[1].append(text)
+
+        baseMetadata = {
+            'filename': mediaEntry.name,
+            'media_id': mediaEntry.id,
+            'caption_id': captionAsset.id,
+            'language_code': captionAsset.languageCode.value,
+            'caption_format': 'SRT', }
+
+        # Chunks are only made for time spans that have captions, so gaps
+        # produce no empty documents.  Sorting keeps out-of-order SRT files
+        # in time order.
+        for chunkIndex in sorted(chunks):
+            (startMilliseconds, texts) = chunks[chunkIndex]
+            startSeconds = startMilliseconds // 1000
+            (startMinutes, seconds) = divmod(startSeconds, 60)
+            (hours, minutes) = divmod(startMinutes, 60)
+            yield Document(
+                page_content='\n'.join(texts),
+                metadata={
+                    **baseMetadata,
+                    'source': sourceTemplate.format(
+                        startSeconds=startSeconds),
+                    # Start time without milliseconds.
+                    'timestamp': f'{hours:02d}:{minutes:02d}:{seconds:02d}',
+                })
+
+    def _sourceTemplate(self, mediaId: str) -> str:
+        """
+        Only `startSeconds` varies between chunks of the same media, so fill
+        in `mediaId` once, leaving a template for `str.format()` with the
+        single `startSeconds` field.
+        """
+        def escape(text: str) -> str:
+            return text.replace('{', '{{').replace('}', '}}')
+
+        formatter = string.Formatter()
+        parts: List[str] = []
+        for (literal, fieldName, formatSpec, conversion) in \
+                self._urlTemplateParts:
+            parts.append(escape(literal))
+            if fieldName == 'mediaId':
+                parts.append(escape(formatter.format_field(
+                    formatter.convert_field(mediaId, conversion),
+                    formatSpec)))
+            elif fieldName is not None:
+                parts.append(
+                    '{' + fieldName
+                    + (f'!{conversion}' if conversion else '')
+                    + (f':{formatSpec}' if formatSpec else '') + '}')
+
+        return ''.join(parts)
+
+    def _listMedia(self) -> KalturaMediaListResponse:
+        with self._clientLock:
+            return self.client.media.list(self.mediaFilter)
+
+    def _listCaptionAssets(
+            self, mediaEntries: Sequence[KalturaMediaEntry]) -> \
+            List[KalturaCaptionAssetListResponse]:
+        def listCall(mediaEntryId: str) -> Callable[[], object]:
+            captionFilter = KalturaCaptionAssetFilter()
+            captionFilter.entryIdEqual = mediaEntryId
+            return partial(
+                self.client.caption.captionAsset.list, captionFilter)
+
+        return self._cachedMultiRequest(
+            self._captionAssetsCache,
+            [mediaEntry.id for mediaEntry in mediaEntries], listCall)
+
+    def _captionUrls(self, captionAssets: Sequence[KalturaCaptionAsset]) -> \
+            List[str]:
+        # Kaltura's `caption.captionAsset.serve()` seemed like it
+        # would give caption contents, but it also only
+        # returned a URL to the captions.
+        return self._cachedMultiRequest(
+            self._captionUrlCache,
+            [captionAsset.id for captionAsset in captionAssets],
+            lambda captionAssetId: partial(
+                self.client.caption.captionAsset.getUrl, captionAssetId))
+
+    def _cachedMultiRequest(
+            self, cache: _TtlCache, keys: Sequence[str],
+            makeCall: Callable[[str], Callable[[], object]]) -> list:
+        """
+        Get results for `keys` from `cache`, batching API calls made with
+        `makeCall()` for only the keys that aren't cached.
+        """
+        results = {key: cache.get(key) for key in keys}
+        missingKeys = [key for key, result in results.items()
+                       if result is None]
+        for key, result in zip(missingKeys, self._multiRequest(
+                [makeCall(key) for key in missingKeys])):
+            results[key] = cache[key] = result
+
+        return [results[key] for key in keys]
+
+    def _multiRequest(self, calls: Sequence[Callable[[], object]]) -> list:
+        """
+        Make Kaltura API calls in as few round trips as possible by batching
+        them into multirequests.  Results are returned in the same order as
+        `calls`.  If any call failed, its exception is raised.
+        """
+        results = []
+        for start in range(0, len(calls), self.MULTIREQUEST_SIZE):
+            with self._clientLock:
+                self.client.startMultiRequest()
+                try:
+                    for call in calls[start:start + self.MULTIREQUEST_SIZE]:
+                        call()
+                    batchResults = self.client.doMultiRequest()
+                finally:
+                    # `KalturaClient` doesn't leave multirequest mode if the
+                    # request fails, which would break all later calls.
+                    if self.client.isMultiRequest():
+                        self.client.multiRequestReturnType = None
+                        self.client.callsQueue = []
+
+            for result in batchResults:
+                if isinstance(result, Exception):
+                    raise result
+            results.extend(batchResults)
+
+        return results
+
+    def _fetchCaptions(self, captionUrl: str) -> List[tuple[int, str]]:
+        with self._http.get(captionUrl, stream=True,
+                            timeout=self.HTTP_TIMEOUT) as response:
+            # Don't parse an error page as captions.
+            response.raise_for_status()
+            # Let urllib3 undo any `Content-Encoding` before decoding text,
+            # and keep it from closing the stream under `TextIOWrapper` at EOF.
+            response.raw.decode_content = True
+            response.raw.auto_close = False
+            # `TextIOWrapper` handles CRLF pairs split across network reads,
+            # which `Response.iter_lines()` would turn into blank lines.
+            # Unlike `Response.encoding`, the charset isn't guessed or
+            # defaulted to ISO-8859-1 for `text/*` types without one.
+            lines = io.TextIOWrapper(
+                response.raw,
+                encoding=_captionCharset(response.headers.get('Content-Type')),
+                errors='replace')
+            return list(_parseSrt(lines))
+
+    async def _afetchCaptionSource(self, session: aiohttp.ClientSession,
+                                   captionUrl: str) -> str:
+        async with session.get(captionUrl) as response:
+            return (await response.read()).decode(
+                _captionCharset(response.headers.get('Content-Type')),
+                errors='replace')
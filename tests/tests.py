@@ -1,7 +1,11 @@
+import asyncio
 import json
 import os.path
+import re
+from collections import Counter
 from http import HTTPMethod
 import sys
+import time
 
 try:
     import flask
@@ -14,6 +18,7 @@ except ImportError:
     sys.exit('Please install http_server_mock with '
              '`pip install http_server_mock`')
 
+from KalturaClient.Base import KalturaClientException
 from LangChainKaltura import KalturaCaptionLoader
 
 HOST_DEFAULT = 'localhost'
@@ -23,32 +28,121 @@ app = HttpServerMock(__name__)
 
 fixturesPathname = os.path.join(os.path.dirname(__file__), 'fixtures', '')
 
+# Number of calls of each Kaltura API service action, including those made
+# within multirequests
+serviceActionCounts: Counter[tuple[str, str]] = Counter()
+
+# When set, the next multirequest is answered only after a delay, to make
+# the client time out
+delayNextMultiRequest = False
+MULTIREQUEST_DELAY_SECONDS = 2
+
+SESSION_ACTIONS = (('session', 'startWidgetSession'),
+                   ('apptoken', 'startSession'))
+
 
 @app.route('/api_v3/service/<service>/action/<action>',
            methods=[HTTPMethod.POST])
 def serviceActionHandler(service, action):
+    serviceActionCounts[(service, action)] += 1
     (host, port) = flask.request.server
     return open(f'{fixturesPathname}{service}_{action}.xml').read().format(
         host=host, port=port)
 
 
+@app.route('/api_v3/service/multirequest', methods=[HTTPMethod.POST])
+def multiRequestHandler():
+    global delayNextMultiRequest
+    if delayNextMultiRequest:
+        delayNextMultiRequest = False
+        time.sleep(MULTIREQUEST_DELAY_SECONDS)
+
+    # Calls are keyed by their index in the request; other keys are
+    # parameters common to all calls (e.g., `ks`).
+    calls = sorted(((int(key), call) for (key, call)
+                    in flask.request.get_json().items() if key.isdigit()),
+                   key=lambda indexedCall: indexedCall[0])
+    items = ''.join(
+        '<item>' + re.search(
+            r'<result>(.*)</result>',
+            serviceActionHandler(call['service'], call['action']),
+            re.DOTALL).group(1) + '</item>'
+        for (_, call) in calls)
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<xml><result>{items}</result></xml>')
+
+
 # contrived route, specified in `caption_captionasset_getUrl.xml`
 @app.route('/captionAsset/contents/<captionFilename>',
            methods=[HTTPMethod.GET])
 def captionAssetContents(captionFilename):
-    return open(f'{fixturesPathname}{captionFilename}').read()
+    # Like many CDNs, don't specify a charset for the UTF-8 caption file.
+    return flask.Response(
+        open(f'{fixturesPathname}{captionFilename}', 'rb').read(),
+        headers={'Content-Type': 'text/plain'})
+
+
+def checkCaptionIds(documents, expectedCaptionIds: set[str]):
+    if (captionIds := {d.metadata['caption_id'] for d in documents}) != \
+            expectedCaptionIds:
+        sys.exit(f'Documents from captions {sorted(captionIds)}, expected '
+                 f'{sorted(expectedCaptionIds)}')
+
+
+def sessionActionCount() -> int:
+    return sum(serviceActionCounts[action] for action in SESSION_ACTIONS)
 
 
 def main(host: str = HOST_DEFAULT, port: int = PORT_DEFAULT):
     with app.run(host, port):
-        kalturaCaptions = KalturaCaptionLoader(
-            '_partner_ID_here_',
-            '_app_token_ID_here_',
-            '_app_token_value_here_',
-            KalturaCaptionLoader.FilterType.MEDIAID,
-            '1_mediaId',
-            'https://example.edu/v/{mediaId}?t={startSeconds}',
-            kalturaApiBaseUrl=f'http://{host}:{port}/')
+        def makeLoader(**kwargs) -> KalturaCaptionLoader:
+            return KalturaCaptionLoader(
+                '_partner_ID_here_',
+                '_app_token_ID_here_',
+                '_app_token_value_here_',
+                KalturaCaptionLoader.FilterType.MEDIAID,
+                '1_mediaId',
+                'https://example.edu/v/{mediaId}?t={startSeconds}',
+                kalturaApiBaseUrl=f'http://{host}:{port}/',
+                **kwargs)
+
+        kalturaCaptions = makeLoader()
         documents = kalturaCaptions.load()
+        if asyncio.run(kalturaCaptions.aload()) != documents:
+            sys.exit('Documents from `aload()` differ from `load()`')
+
+        # Only SRT captions in the default (English) languages are loaded.
+        checkCaptionIds(documents, {'1_captionId', '1_captionIdEnUs'})
+        checkCaptionIds(makeLoader(languages=None).load(),
+                        {'1_captionId', '1_captionIdFr', '1_captionIdEnUs'})
+
+        # Only the caption in the earliest listed language is loaded.
+        checkCaptionIds(makeLoader(preferFirstLanguageOnly=True).load(),
+                        {'1_captionIdEnUs'})
+        checkCaptionIds(makeLoader(languages=('fr', 'en-us', 'fr'),
+                                   preferFirstLanguageOnly=True).load(),
+                        {'1_captionIdFr'})
+
+        # A failed multirequest doesn't leave the client unusable.
+        global delayNextMultiRequest
+        failingLoader = makeLoader()
+        failingLoader.client.config.requestTimeout = 1
+        delayNextMultiRequest = True
+        try:
+            failingLoader.load()
+            sys.exit('Timed out multirequest did not raise an exception')
+        except KalturaClientException:
+            pass
+        failingLoader.client.config.requestTimeout = \
+            MULTIREQUEST_DELAY_SECONDS * 2
+        if failingLoader.load() != documents:
+            sys.exit('Documents differ after a failed multirequest')
+
+        # A loader with the same credentials reuses the cached session.
+        sessionCount = sessionActionCount()
+        makeLoader()
+        if sessionActionCount() != sessionCount:
+            sys.exit('Second loader did not reuse the cached Kaltura session')
+
         print(json.dumps([d.to_json()['kwargs'] for d in documents],
                          indent=2, sort_keys=True))